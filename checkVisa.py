@@ -1,11 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
+import httpx
+from selectolax.lexbor import LexborHTMLParser
 import logging
 import os
-import json
+import orjson
+import random
+import re
+import socket
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
 
 # ====================================
 # CONFIGURACIÓN
@@ -14,16 +18,67 @@ from pathlib import Path
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "TU_BOT_TOKEN_AQUI")
 CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "TU_CHAT_ID_AQUI")
 
+# URL y parámetros base del bot, construidos una sola vez al importar:
+# BOT_TOKEN y CHAT_ID son constantes del proceso.
+TELEGRAM_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+TELEGRAM_BASE_PARAMS = {"chat_id": CHAT_ID, "parse_mode": "HTML"}
+
 # Configuración del monitoreo
 CHECK_INTERVAL = int(os.environ.get("CHECK_INTERVAL", "300"))  # 5 minutos por defecto
 COUNTRY = os.environ.get("COUNTRY", "Spain")
+# Con RUN_ONCE=1 el script hace una sola verificación y termina: pensado
+# para lanzarlo desde un timer de systemd o cron (ver systemd/) en lugar
+# de mantener el proceso residente entre verificaciones.
+RUN_ONCE = os.environ.get("RUN_ONCE", "0") == "1"
 URL = "https://immi.homeaffairs.gov.au/what-we-do/whm-program/status-of-country-caps"
 
+# Selectores de estado, del más específico al más genérico. Se definen una
+# sola vez a nivel de módulo para no reconstruir la lista en cada fila/poll.
+STATUS_SELECTORS = (
+    "span.label.label-primary",
+    "span.label.label-success",
+    "span.label.label-warning",
+    "span.label.label-danger",
+    "span.label",
+    ".status",
+    "td:last-child",
+)
+
+# Último selector que acertó: en la práctica siempre casa el mismo, así que
+# probarlo primero deja el bucle de selectores en una iteración por poll.
+# Se siembra desde el archivo de estado al arrancar y se persiste al cambiar.
+_last_successful_selector = None
+
+# Escáner especializado para la forma conocida de la tabla: una fila <tr>
+# con el nombre del país y un <span class="label ...">estado</span>. Las
+# regex (compiladas una vez) corren en C y evitan construir el DOM en el
+# caso común; si el marcado cambia, get_visa_status cae al parser Lexbor.
+ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.DOTALL | re.IGNORECASE)
+STATUS_RE = re.compile(
+    rf'{re.escape(COUNTRY)}.*?<span\s+class="label[^"]*"[^>]*>([^<]+)</span>',
+    re.DOTALL | re.IGNORECASE)
+
 # Archivos de persistencia
 SCRIPT_DIR = Path(__file__).parent
 STATE_FILE = SCRIPT_DIR / "visa_status_state.json"
 LOG_FILE = SCRIPT_DIR / "visa_checker.log"
 
+# ====================================
+# SESIÓN HTTP COMPARTIDA
+# ====================================
+# Cabeceras para el único AsyncClient del proceso (se abre en main()):
+# un solo cliente con HTTP/2 reutiliza y multiplexa las conexiones TCP/TLS
+# hacia el sitio de inmigración y la API de Telegram en lugar de abrir una
+# conexión nueva en cada verificación.
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    # Pedimos compresión explícitamente: la tabla HTML comprime muy bien y
+    # httpx descomprime gzip/deflate solo (br requiere el paquete brotli).
+    'Accept-Encoding': 'gzip, deflate, br'
+}
+HTTP_TIMEOUT = httpx.Timeout(30.0)
+TELEGRAM_TIMEOUT = httpx.Timeout(10.0)
+
 # ====================================
 # CONFIGURACIÓN DE LOGGING
 # ====================================
@@ -40,113 +95,240 @@ logger = logging.getLogger(__name__)
 # ====================================
 # FUNCIONES AUXILIARES
 # ====================================
-def load_previous_state():
-    """Carga el estado anterior desde el archivo"""
-    try:
-        if STATE_FILE.exists():
-            with open(STATE_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('status'), data.get('last_check')
-        return None, None
-    except Exception as e:
-        logger.error(f"Error cargando estado anterior: {e}")
-        return None, None
+class StateStore:
+    """Estado del monitor en memoria, respaldado por STATE_FILE.
 
-def save_state(status, timestamp):
-    """Guarda el estado actual en el archivo"""
-    try:
-        data = {
-            'status': status,
-            'last_check': timestamp,
-            'country': COUNTRY
-        }
-        with open(STATE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.debug(f"Estado guardado: {status}")
-    except Exception as e:
-        logger.error(f"Error guardando estado: {e}")
+    El archivo se lee una sola vez al arrancar (load) y el estado vive en
+    un dict en memoria; save_if_dirty() solo toca el disco cuando algún
+    campo cambió desde la última escritura, con escritura atómica.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self._data = {}
+        self._dirty = False
 
-def send_telegram_message(message):
+    def load(self):
+        """Carga el estado anterior (y los validadores HTTP) desde el archivo"""
+        try:
+            if self.path.exists():
+                self._data = orjson.loads(self.path.read_bytes())
+        except Exception as e:
+            logger.error("Error cargando estado anterior: %s", e)
+            self._data = {}
+        # El estado guardado solo vale para el país que lo generó: si COUNTRY
+        # cambió, reutilizar sus validadores haría que un 304 devolviera el
+        # estado del país anterior hasta que la página cambiara de ETag.
+        saved_country = self._data.get('country')
+        if saved_country is not None and saved_country != COUNTRY:
+            logger.info("Estado guardado pertenece a %s, ignorado para %s",
+                        saved_country, COUNTRY)
+            for key in ('status', 'last_check', 'etag', 'last_modified'):
+                self._data.pop(key, None)
+        self._dirty = False
+        return self
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def update(self, **fields):
+        """Actualiza campos en memoria, marcando dirty solo si algo cambió"""
+        for key, value in fields.items():
+            if self._data.get(key) != value:
+                self._data[key] = value
+                self._dirty = True
+
+    def save_if_dirty(self):
+        """Guarda el estado en el archivo si cambió (escritura atómica)"""
+        if not self._dirty:
+            return
+        try:
+            self._data['country'] = COUNTRY
+            # Escribimos a un temporal y hacemos os.replace: o queda el estado
+            # anterior o el nuevo completo, nunca un JSON truncado que forzaría
+            # un reinicio "fresh" (y una notificación espuria) tras un crash.
+            tmp_file = self.path.with_suffix('.json.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(self._data, option=orjson.OPT_INDENT_2))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
+            self._dirty = False
+            logger.debug("Estado guardado: %s", self._data.get('status'))
+        except Exception as e:
+            logger.error("Error guardando estado: %s", e)
+
+async def send_telegram_message(client, message):
     """Envía un mensaje por Telegram"""
     try:
         if BOT_TOKEN == "TU_BOT_TOKEN_AQUI" or CHAT_ID == "TU_CHAT_ID_AQUI":
             logger.warning("Telegram no configurado correctamente. Mensaje no enviado.")
-            logger.info(f"Mensaje que se habría enviado: {message}")
+            logger.info("Mensaje que se habría enviado: %s", message)
             return False
-        
-        telegram_url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-        params = {
-            "chat_id": CHAT_ID,
-            "text": message,
-            "parse_mode": "HTML"
-        }
-        
-        response = requests.post(telegram_url, params=params, timeout=10)
+
+        params = {**TELEGRAM_BASE_PARAMS, "text": message}
+
+        response = await client.post(TELEGRAM_URL, params=params, timeout=TELEGRAM_TIMEOUT)
         response.raise_for_status()
-        
+
         logger.info("Mensaje enviado por Telegram exitosamente")
         return True
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error enviando mensaje por Telegram: {e}")
+
+    except httpx.HTTPError as e:
+        logger.error("Error enviando mensaje por Telegram: %s", e)
         return False
 
-def get_visa_status():
-    """Obtiene el estado actual de las visas desde el sitio web"""
+async def prewarm_dns():
+    """Pre-resuelve en paralelo los hosts que usa el monitor.
+
+    En arranques fríos (modo RUN_ONCE) cada host costaría su ida y vuelta
+    de DNS en serie al hacer la primera petición; resolverlos a la vez al
+    arrancar solapa ambas consultas y deja caliente la caché del
+    resolvedor local para el resto del proceso.
+    """
+    loop = asyncio.get_running_loop()
+    hosts = (urlsplit(URL).hostname, urlsplit(TELEGRAM_URL).hostname)
+    results = await asyncio.gather(
+        *(loop.getaddrinfo(host, 443, type=socket.SOCK_STREAM) for host in hosts),
+        return_exceptions=True)
+    for host, result in zip(hosts, results):
+        if isinstance(result, Exception):
+            logger.warning("No se pudo pre-resolver %s: %s", host, result)
+        else:
+            logger.debug("DNS pre-resuelto para %s", host)
+
+async def get_visa_status(client, previous_status=None, etag=None, last_modified=None):
+    """Obtiene el estado actual de las visas desde el sitio web.
+
+    Envía una petición condicional (If-None-Match / If-Modified-Since) si
+    conocemos los validadores de la descarga anterior: cuando la página no
+    ha cambiado el servidor responde 304 sin cuerpo y nos ahorramos la
+    descarga y el parseo completos.
+
+    Devuelve una tupla (status, etag, last_modified).
+
+    PERF: el camino caliente de cada poll es IO-bound en bytes movidos
+    (~100 KB de HTML) y CPU-bound en el parseo. Presupuesto orientativo:
+    <50 ms de pared por poll; <10 ms de CPU en un 304, <80 ms en un 200
+    completo. Qué cubre cada pieza (no deshacer ninguna sin medir):
+      - bytes/IO: cliente compartido con HTTP/2 keep-alive,
+        Accept-Encoding (gzip/br) y descarga por trozos con corte
+        temprano al completarse la fila del país;
+      - CPU: escáner regex especializado, con fallback a Lexbor más
+        prefiltro de fila por substring y el selector ganador primero;
+      - caso común (sin cambios): el GET condicional (ETag /
+        If-Modified-Since) elimina ambos lados de golpe con un 304.
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        logger.debug(f"Consultando URL: {URL}")
-        response = requests.get(URL, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        logger.debug("Consultando URL: %s", URL)
+        async with client.stream("GET", URL, headers=headers) as response:
+            if response.status_code == 304:
+                logger.debug("Página sin cambios (304), reutilizando estado anterior")
+                return previous_status, etag, last_modified
+
+            response.raise_for_status()
+
+            new_etag = response.headers.get('ETag')
+            new_last_modified = response.headers.get('Last-Modified')
+
+            # Leemos el cuerpo por trozos y cortamos la descarga en cuanto
+            # la fila del país está completa en el buffer: suele aparecer al
+            # principio de la tabla, así que nos ahorramos el resto de la
+            # página (bytes del socket + string gigante + DOM más grande).
+            country_token = COUNTRY.encode('utf-8')
+            buffer = bytearray()
+            row_complete = False
+            async for chunk in response.aiter_bytes(65536):
+                buffer += chunk
+                # Solo cortamos si alguna aparición del token está dentro de
+                # una fila abierta (<tr> sin cerrar antes de él) y esa fila
+                # ya está completa en el buffer: el país puede mencionarse
+                # antes de la tabla (navegación, texto introductorio) y
+                # cortar ahí truncaría la fila real.
+                pos = buffer.find(country_token)
+                while pos != -1 and not row_complete:
+                    inside_row = buffer.rfind(b'<tr', 0, pos) > buffer.rfind(b'</tr>', 0, pos)
+                    if inside_row and buffer.find(b'</tr>', pos) != -1:
+                        row_complete = True
+                    else:
+                        pos = buffer.find(country_token, pos + len(country_token))
+                if row_complete:
+                    logger.debug("Fila del país completa en el buffer, abortando descarga")
+                    break
+            html = buffer.decode(response.charset_encoding or 'utf-8', errors='replace')
+
+        # Filtro rápido: si el país ni siquiera aparece en el HTML crudo
+        # (página de error, mantenimiento...), no construimos el DOM.
+        if COUNTRY not in html:
+            logger.warning("%s no aparece en la página descargada", COUNTRY)
+            return None, None, None
+
+        # Camino rápido: escáner regex para la forma conocida de la tabla,
+        # sin construir el DOM. Si no casa, seguimos con el parser completo.
+        for match in ROW_RE.finditer(html):
+            row_html = match.group(1)
+            if COUNTRY not in row_html:
+                continue
+            status_match = STATUS_RE.search(row_html)
+            if status_match:
+                current_status = status_match.group(1).strip()
+                if current_status and current_status.lower() not in ['', 'n/a', '-']:
+                    logger.debug("Estado encontrado por el escáner rápido: %s", current_status)
+                    return current_status, new_etag, new_last_modified
+
+        tree = LexborHTMLParser(html)
+
         # Buscar la fila que contiene el país especificado
-        rows = soup.find_all("tr")
-        for row in rows:
-            row_text = row.get_text(strip=True)
+        for row in tree.css("tr"):
+            # Descarte barato: buscar el país en el HTML crudo de la fila
+            # (memmem en C) antes de pagar la normalización de texto del
+            # subárbol completo con row.text() en cada fila.
+            if COUNTRY not in row.html:
+                continue
+            row_text = row.text(strip=True)
             if COUNTRY in row_text:
-                logger.debug(f"Fila encontrada para {COUNTRY}: {row_text}")
-                
-                # Buscar diferentes tipos de etiquetas de estado
-                status_selectors = [
-                    "span.label.label-primary",
-                    "span.label.label-success", 
-                    "span.label.label-warning",
-                    "span.label.label-danger",
-                    "span.label",
-                    ".status",
-                    "td:last-child"
-                ]
-                
-                for selector in status_selectors:
-                    status_element = row.select_one(selector)
+                logger.debug("Fila encontrada para %s: %s", COUNTRY, row_text)
+
+                # Buscar diferentes tipos de etiquetas de estado, empezando
+                # por el selector que acertó la última vez
+                global _last_successful_selector
+                selectors = STATUS_SELECTORS
+                if _last_successful_selector in STATUS_SELECTORS:
+                    selectors = ((_last_successful_selector,) +
+                                 tuple(s for s in STATUS_SELECTORS if s != _last_successful_selector))
+
+                for selector in selectors:
+                    status_element = row.css_first(selector)
                     if status_element:
-                        current_status = status_element.get_text(strip=True)
+                        current_status = status_element.text(strip=True)
                         if current_status and current_status.lower() not in ['', 'n/a', '-']:
-                            logger.debug(f"Estado encontrado con selector {selector}: {current_status}")
-                            return current_status
-                
+                            logger.debug("Estado encontrado con selector %s: %s", selector, current_status)
+                            _last_successful_selector = selector
+                            return current_status, new_etag, new_last_modified
+
                 # Si no encontramos un estado específico, tomamos el último td
-                cells = row.find_all("td")
+                cells = row.css("td")
                 if cells:
-                    last_cell = cells[-1].get_text(strip=True)
+                    last_cell = cells[-1].text(strip=True)
                     if last_cell:
-                        logger.debug(f"Estado obtenido de última celda: {last_cell}")
-                        return last_cell
-        
-        logger.warning(f"No se encontró información para {COUNTRY}")
-        return None
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error de conexión: {e}")
-        return None
+                        logger.debug("Estado obtenido de última celda: %s", last_cell)
+                        return last_cell, new_etag, new_last_modified
+
+        logger.warning("No se encontró información para %s", COUNTRY)
+        return None, None, None
+
+    except httpx.HTTPError as e:
+        logger.error("Error de conexión: %s", e)
+        return None, None, None
     except Exception as e:
-        logger.error(f"Error procesando página web: {e}")
-        return None
+        logger.error("Error procesando página web: %s", e)
+        return None, None, None
 
 def validate_config():
     """Valida la configuración inicial"""
@@ -172,76 +354,121 @@ def validate_config():
 # ====================================
 # FUNCIÓN PRINCIPAL
 # ====================================
-def main():
+async def main():
+    global _last_successful_selector
+
     logger.info("=== Iniciando Monitor de Visas Working Holiday ===")
-    
+
     # Validar configuración
     validate_config()
-    
-    # Cargar estado anterior
-    previous_status, last_check = load_previous_state()
+
+    # Cargar estado anterior (una sola lectura de disco por proceso)
+    state = StateStore().load()
+    previous_status = state.get('status')
+    etag = state.get('etag')
+    last_modified = state.get('last_modified')
+    _last_successful_selector = state.get('last_selector')
     if previous_status:
-        logger.info(f"Estado anterior cargado: {previous_status} (última verificación: {last_check})")
+        logger.info(f"Estado anterior cargado: {previous_status} (última verificación: {state.get('last_check')})")
     else:
         logger.info("No se encontró estado anterior, iniciando monitoreo fresh")
-    
-    consecutive_errors = 0
+
+    # El contador de errores se persiste (clave error_count del estado): en
+    # modo RUN_ONCE cada invocación es un proceso nuevo y, sin guardarlo, la
+    # alerta crítica de errores consecutivos no podría dispararse nunca.
+    consecutive_errors = state.get('error_count') or 0
     max_consecutive_errors = 5
-    
-    while True:
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            logger.info(f"Verificando estado... ({timestamp})")
-            
-            current_status = get_visa_status()
-            
-            if current_status is None:
+
+    # Calentar el DNS de ambos hosts antes de la primera petición
+    await prewarm_dns()
+
+    # Un único AsyncClient para todo el proceso: el pool de conexiones se
+    # comparte entre el fetch de la página y los envíos a Telegram, y con
+    # HTTP/2 ambas peticiones pueden multiplexarse sobre una sola conexión
+    # TLS cuando van al mismo host.
+    async with httpx.AsyncClient(http2=True, headers=HEADERS, timeout=HTTP_TIMEOUT) as client:
+        while True:
+            try:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                logger.info(f"Verificando estado... ({timestamp})")
+
+                current_status, etag, last_modified = await get_visa_status(
+                    client, previous_status, etag, last_modified)
+
+                if current_status is None:
+                    consecutive_errors += 1
+                    logger.error(f"No se pudo obtener el estado ({consecutive_errors}/{max_consecutive_errors})")
+
+                    if consecutive_errors >= max_consecutive_errors:
+                        error_msg = f"🚨 <b>Error crítico</b>\n\nNo se ha podido verificar el estado de las visas durante {consecutive_errors} intentos consecutivos.\n\nÚltimo estado conocido: {previous_status or 'Desconocido'}"
+                        await send_telegram_message(client, error_msg)
+                        consecutive_errors = 0  # Reset counter after sending alert
+
+                    state.update(error_count=consecutive_errors)
+                    state.save_if_dirty()
+
+                else:
+                    consecutive_errors = 0  # Reset counter on successful check
+                    state.update(error_count=0)
+                    logger.info(f"Estado actual: {current_status}")
+
+                    # Comparar con estado anterior
+                    if current_status != previous_status:
+                        if previous_status is None:
+                            # Primera ejecución
+                            message = f"🤖 <b>Monitor iniciado</b>\n\nPaís: {COUNTRY}\nEstado actual: <b>{current_status}</b>\n\nMonitoreando cambios cada {CHECK_INTERVAL//60} minutos..."
+                            logger.info("Primera ejecución - enviando estado inicial")
+                        else:
+                            # Cambio de estado detectado
+                            message = f"🔄 <b>¡Cambio detectado!</b>\n\nPaís: {COUNTRY}\nEstado anterior: {previous_status}\nEstado nuevo: <b>{current_status}</b>\n\nFecha: {timestamp}"
+                            logger.info(f"¡CAMBIO DETECTADO! {previous_status} → {current_status}")
+
+                        # Enviar notificación
+                        await send_telegram_message(client, message)
+
+                        # Actualizar estado
+                        previous_status = current_status
+                        state.update(status=current_status, last_check=timestamp,
+                                     etag=etag, last_modified=last_modified,
+                                     last_selector=_last_successful_selector)
+                        state.save_if_dirty()
+                    else:
+                        logger.info("Sin cambios detectados")
+                        # A propósito no refrescamos last_check: solo se toca
+                        # el disco si cambiaron los validadores HTTP o el
+                        # selector ganador.
+                        state.update(etag=etag, last_modified=last_modified,
+                                     last_selector=_last_successful_selector)
+                        state.save_if_dirty()
+
+            except Exception as e:
+                logger.error(f"Error inesperado: {e}")
                 consecutive_errors += 1
-                logger.error(f"No se pudo obtener el estado ({consecutive_errors}/{max_consecutive_errors})")
-                
-                if consecutive_errors >= max_consecutive_errors:
-                    error_msg = f"🚨 <b>Error crítico</b>\n\nNo se ha podido verificar el estado de las visas durante {consecutive_errors} intentos consecutivos.\n\nÚltimo estado conocido: {previous_status or 'Desconocido'}"
-                    send_telegram_message(error_msg)
-                    consecutive_errors = 0  # Reset counter after sending alert
-                
+                state.update(error_count=consecutive_errors)
+                state.save_if_dirty()
+
+            if RUN_ONCE:
+                logger.info("Modo una sola pasada (RUN_ONCE=1), terminando")
+                break
+
+            if consecutive_errors:
+                # Backoff exponencial con jitter: tras un fallo transitorio
+                # reintentamos pronto (2, 4, 8... segundos, con tope en
+                # CHECK_INTERVAL) en vez de esperar los 5 minutos completos,
+                # y el jitter evita reintentos sincronizados contra el sitio.
+                backoff = min(CHECK_INTERVAL, 2 ** consecutive_errors)
+                wait = backoff + random.uniform(0, 0.5 * backoff)
+                logger.info(f"Reintentando en {wait:.1f} segundos (tras {consecutive_errors} errores)")
+                await asyncio.sleep(wait)
             else:
-                consecutive_errors = 0  # Reset counter on successful check
-                logger.info(f"Estado actual: {current_status}")
-                
-                # Comparar con estado anterior
-                if current_status != previous_status:
-                    if previous_status is None:
-                        # Primera ejecución
-                        message = f"🤖 <b>Monitor iniciado</b>\n\nPaís: {COUNTRY}\nEstado actual: <b>{current_status}</b>\n\nMonitoreando cambios cada {CHECK_INTERVAL//60} minutos..."
-                        logger.info("Primera ejecución - enviando estado inicial")
-                    else:
-                        # Cambio de estado detectado
-                        message = f"🔄 <b>¡Cambio detectado!</b>\n\nPaís: {COUNTRY}\nEstado anterior: {previous_status}\nEstado nuevo: <b>{current_status}</b>\n\nFecha: {timestamp}"
-                        logger.info(f"¡CAMBIO DETECTADO! {previous_status} → {current_status}")
-                    
-                    # Enviar notificación
-                    send_telegram_message(message)
-                    
-                    # Actualizar estado
-                    previous_status = current_status
-                    save_state(current_status, timestamp)
-                else:
-                    logger.info("Sin cambios detectados")
-                    # Actualizar timestamp aunque no haya cambios
-                    save_state(current_status, timestamp)
-            
-        except KeyboardInterrupt:
-            logger.info("Deteniendo el monitor por solicitud del usuario...")
-            break
-        except Exception as e:
-            logger.error(f"Error inesperado: {e}")
-            consecutive_errors += 1
-        
-        logger.info(f"Esperando {CHECK_INTERVAL} segundos hasta la próxima verificación...")
-        time.sleep(CHECK_INTERVAL)
+                logger.info(f"Esperando {CHECK_INTERVAL} segundos hasta la próxima verificación...")
+                await asyncio.sleep(CHECK_INTERVAL)
 
 # ====================================
 # PUNTO DE ENTRADA
 # ====================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Deteniendo el monitor por solicitud del usuario...")
\ No newline at end of file